@@ -3,32 +3,146 @@ Automated News Content Production System
 A Flask-based application with strict 6-step workflow and RBAC
 """
 
-from flask import Flask, request, jsonify, render_template, send_from_directory
+from flask import Flask, request, jsonify, render_template, send_from_directory, make_response
+from flask.json.provider import JSONProvider
 from flask_sqlalchemy import SQLAlchemy
 from flask_cors import CORS
-from werkzeug.security import generate_password_hash, check_password_hash
+from sqlalchemy import case, event, func, insert, inspect, or_, select
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import IntegrityError, OperationalError
+from sqlalchemy.orm import joinedload, selectinload
+from werkzeug.security import check_password_hash
 from werkzeug.utils import secure_filename
+from passlib.context import CryptContext
+from cachetools import TTLCache, cached
 import jwt
+import orjson
+from collections import namedtuple
 from datetime import datetime, timedelta, timezone
-from functools import wraps
+from functools import wraps, lru_cache
+from urllib.parse import quote
+import io
 import os
-import json
+import mimetypes
+import shutil
+import sys
+import tempfile
+import time
+import sqlite3
+import threading
+
+try:
+    from gevent import get_hub
+    from gevent.monkey import is_module_patched
+except ImportError:  # gevent is only needed when served through wsgi.py
+    get_hub = None
+
+
+class ORJSONProvider(JSONProvider):
+    """JSON provider backed by orjson - datetimes serialize natively as UTC ISO 8601"""
+    option = orjson.OPT_NAIVE_UTC | orjson.OPT_NON_STR_KEYS
+    
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, option=self.option).decode()
+    
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+    
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(orjson.dumps(obj, option=self.option), mimetype='application/json')
+
 
 app = Flask(__name__)
+app.json = ORJSONProvider(app)
 app.config['SECRET_KEY'] = 'your-secret-key-change-in-production'
 app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///news_production.db'
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+app.config['SQLALCHEMY_ENGINE_OPTIONS'] = {
+    'pool_size': 10,  # Room for concurrent greenlets
+    'max_overflow': 20,
+    # JSON columns (asset metadata) go through orjson like the API responses
+    'json_serializer': lambda obj: orjson.dumps(obj).decode(),
+    'json_deserializer': orjson.loads
+}
 app.config['UPLOAD_FOLDER'] = 'uploads'
 app.config['MAX_CONTENT_LENGTH'] = 500 * 1024 * 1024  # 500MB max file size
+app.config['UPLOAD_BUFFER_SIZE'] = 1024 * 1024  # Copy uploads to disk in 1MB blocks
+# Let the reverse proxy stream downloads after the access check (both off by default):
+#   nginx: UPLOAD_ACCEL_PREFIX=/protected_uploads/ with
+#          location /protected_uploads/ { internal; alias /path/to/uploads/; sendfile on; tcp_nopush on; }
+#   Apache (mod_xsendfile): USE_X_SENDFILE=1 with XSendFile On
+app.config['UPLOAD_ACCEL_PREFIX'] = os.environ.get('UPLOAD_ACCEL_PREFIX')
+app.config['USE_X_SENDFILE'] = os.environ.get('USE_X_SENDFILE') == '1'
+app.config['BCRYPT_ROUNDS'] = int(os.environ.get('BCRYPT_ROUNDS', 12))  # Lower (e.g. 4) for tests/CI
+# Deliver notifications from a worker (celery -A app.celery worker) when set, e.g. redis://localhost:6379/0
+app.config['CELERY_BROKER_URL'] = os.environ.get('CELERY_BROKER_URL')
+# Cache polled notification lists in Redis when set, e.g. redis://localhost:6379/1
+app.config['REDIS_URL'] = os.environ.get('REDIS_URL')
+app.config['NOTIFICATION_CACHE_TTL'] = 10  # Seconds; commits invalidate earlier
 
 CORS(app)
 db = SQLAlchemy(app)
 
+# Password hashing - bcrypt for new hashes, argon2 still verified
+pwd_context = CryptContext(
+    schemes=['bcrypt', 'argon2'],
+    deprecated='auto',
+    bcrypt__rounds=app.config['BCRYPT_ROUNDS']
+)
+
+
+def offload_hashing(func, *args):
+    """Run a CPU-bound hash on gevent's native thread pool so other greenlets keep running"""
+    if get_hub is not None and is_module_patched('threading'):
+        return get_hub().threadpool.apply(func, args)
+    return func(*args)  # Plain threads already run in parallel - bcrypt releases the GIL
+
+
+@lru_cache(maxsize=256)
+def encode_error(message):
+    """Encode an error body once per distinct message"""
+    return orjson.dumps({'error': message})
+
+
+def error_response(message, status):
+    """Error response from pre-encoded bytes - the Response itself stays per request (CORS adds headers)"""
+    return app.response_class(encode_error(message), status=status, mimetype='application/json')
+
+
+# JWT codec and HMAC key built once instead of on every encode/decode
+jwt_codec = jwt.PyJWT()
+jwt_secret = app.config['SECRET_KEY'].encode()
+
+
+@event.listens_for(Engine, 'connect')
+def set_sqlite_pragmas(dbapi_connection, connection_record):
+    """WAL lets readers run alongside a writer; NORMAL sync fsyncs at checkpoints, not every commit"""
+    if not isinstance(dbapi_connection, sqlite3.Connection):
+        return
+    cursor = dbapi_connection.cursor()
+    cursor.execute('PRAGMA journal_mode=WAL')
+    cursor.execute('PRAGMA synchronous=NORMAL')
+    cursor.execute('PRAGMA cache_size=-65536')  # 64MB page cache
+    cursor.execute('PRAGMA temp_store=MEMORY')
+    cursor.execute('PRAGMA mmap_size=268435456')  # 256MB memory-mapped reads
+    cursor.close()
+
+
 # Ensure upload folder exists
 os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
 
 # ==================== DATABASE MODELS ====================
 
+def column_dict(instance, keys):
+    """Plain-column values read straight from the instance's loaded state, skipping the descriptors"""
+    state = instance.__dict__
+    try:
+        return {key: state[key] for key in keys}
+    except KeyError:  # Expired or not yet loaded - attribute access refreshes it
+        return {key: getattr(instance, key) for key in keys}
+
+
 class User(db.Model):
     """User model - all users are standard users who can create projects"""
     id = db.Column(db.Integer, primary_key=True)
@@ -36,24 +150,48 @@ class User(db.Model):
     email = db.Column(db.String(120), unique=True, nullable=False)
     password_hash = db.Column(db.String(255), nullable=False)
     full_name = db.Column(db.String(120), nullable=False)
-    created_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
+    created_at = db.Column(db.DateTime(timezone=True), default=func.now())
     is_active = db.Column(db.Boolean, default=True)
     
+    _cached_dict = None  # Serialized form, reused until the instance is expired/refreshed
+    
     def set_password(self, password):
-        self.password_hash = generate_password_hash(password)
+        self.password_hash = offload_hashing(pwd_context.hash, password)
     
     def check_password(self, password):
-        return check_password_hash(self.password_hash, password)
+        """Verify password and rehash in place if the stored hash is outdated"""
+        if pwd_context.identify(self.password_hash, required=False) is None:
+            # Legacy Werkzeug hash - migrate to the current scheme on success
+            if not offload_hashing(check_password_hash, self.password_hash, password):
+                return False
+            self.set_password(password)
+            return True
+        
+        valid, new_hash = offload_hashing(pwd_context.verify_and_update, password, self.password_hash)
+        if valid and new_hash:
+            self.password_hash = new_hash
+        return valid
+    
+    _dict_columns = ('id', 'username', 'email', 'full_name', 'created_at', 'is_active')
     
     def to_dict(self):
-        return {
-            'id': self.id,
-            'username': self.username,
-            'email': self.email,
-            'full_name': self.full_name,
-            'created_at': self.created_at.isoformat(),
-            'is_active': self.is_active
-        }
+        if self._cached_dict is None:
+            self._cached_dict = column_dict(self, self._dict_columns)
+        return self._cached_dict
+
+
+@event.listens_for(User, 'expire')
+@event.listens_for(User, 'refresh')
+def clear_user_dict_cache(user, *args):
+    """Drop the cached to_dict output whenever the row is reloaded"""
+    if user is not None:  # Instance may already be garbage collected on rollback
+        user._cached_dict = None
+
+
+@event.listens_for(User, 'after_update')
+def clear_user_dict_cache_on_update(mapper, connection, user):
+    """Also drop it when the row is flushed mid-request, before any commit expires it"""
+    user._cached_dict = None
 
 
 class Project(db.Model):
@@ -64,27 +202,24 @@ class Project(db.Model):
     owner_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)  # Project creator/owner
     status = db.Column(db.String(50), default='In Progress')  # In Progress, Completed, Cancelled
     current_step_number = db.Column(db.Integer)  # Current active step number
-    created_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
-    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    created_at = db.Column(db.DateTime(timezone=True), default=func.now())
+    updated_at = db.Column(db.DateTime(timezone=True), default=func.now(), onupdate=func.now())
+    
+    __table_args__ = (
+        db.Index('ix_project_owner_status', 'owner_id', 'status'),
+    )
     
     # Relationships
     owner = db.relationship('User', foreign_keys=[owner_id], backref='owned_projects')
-    steps = db.relationship('ProjectStep', backref='project', lazy='dynamic', cascade='all, delete-orphan', order_by='ProjectStep.step_number.desc()')
+    steps = db.relationship('ProjectStep', back_populates='project', cascade='all, delete-orphan', order_by='ProjectStep.step_number.desc()')
+    
+    _dict_columns = ('id', 'project_name', 'description', 'owner_id', 'status', 'current_step_number', 'created_at', 'updated_at')
     
     def to_dict(self, include_steps=True):
-        data = {
-            'id': self.id,
-            'project_name': self.project_name,
-            'description': self.description,
-            'owner_id': self.owner_id,
-            'owner': self.owner.to_dict() if self.owner else None,
-            'status': self.status,
-            'current_step_number': self.current_step_number,
-            'created_at': self.created_at.isoformat(),
-            'updated_at': self.updated_at.isoformat()
-        }
+        data = column_dict(self, self._dict_columns)
+        data['owner'] = self.owner.to_dict() if self.owner else None
         if include_steps:
-            data['steps'] = [step.to_dict() for step in self.steps.order_by(ProjectStep.step_number.desc()).all()]
+            data['steps'] = [step.to_dict() for step in self.steps]
         return data
 
 
@@ -97,25 +232,25 @@ class ProjectStep(db.Model):
     task_description = db.Column(db.Text, nullable=False)  # Specific task
     assigned_user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
     status = db.Column(db.String(50), default='Pending')  # Pending, In Progress, Completed, Sent Back
-    completed_at = db.Column(db.DateTime)
-    created_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
+    completed_at = db.Column(db.DateTime(timezone=True))
+    created_at = db.Column(db.DateTime(timezone=True), default=func.now())
+    
+    __table_args__ = (
+        db.Index('ix_step_proj_num', 'project_id', 'step_number', unique=True),
+        db.Index('ix_step_user_status', 'assigned_user_id', 'status'),
+        db.Index('ix_step_proj_user', 'project_id', 'assigned_user_id'),
+    )
     
     # Relationships
+    project = db.relationship('Project', back_populates='steps')
     assigned_user = db.relationship('User', foreign_keys=[assigned_user_id])
     
+    _dict_columns = ('id', 'project_id', 'step_number', 'step_name', 'task_description', 'assigned_user_id', 'status', 'completed_at', 'created_at')
+    
     def to_dict(self):
-        return {
-            'id': self.id,
-            'project_id': self.project_id,
-            'step_number': self.step_number,
-            'step_name': self.step_name,
-            'task_description': self.task_description,
-            'assigned_user_id': self.assigned_user_id,
-            'assigned_user': self.assigned_user.to_dict() if self.assigned_user else None,
-            'status': self.status,
-            'completed_at': self.completed_at.isoformat() if self.completed_at else None,
-            'created_at': self.created_at.isoformat()
-        }
+        data = column_dict(self, self._dict_columns)
+        data['assigned_user'] = self.assigned_user.to_dict() if self.assigned_user else None
+        return data
 
 
 class WorkflowAction(db.Model):
@@ -127,23 +262,22 @@ class WorkflowAction(db.Model):
     action = db.Column(db.String(100), nullable=False)  # forward, send_back, complete, create, edit, delete
     step_number = db.Column(db.Integer)
     comments = db.Column(db.Text)
-    timestamp = db.Column(db.DateTime, default=datetime.utcnow)
+    timestamp = db.Column(db.DateTime(timezone=True), default=func.now())
+    
+    __table_args__ = (
+        db.Index('ix_action_proj_id', 'project_id', 'id'),  # Audit trail pages newest-first by id
+    )
     
     project = db.relationship('Project', backref='actions')
     step = db.relationship('ProjectStep', backref='actions')
     user = db.relationship('User')
     
+    _dict_columns = ('id', 'project_id', 'step_id', 'action', 'step_number', 'comments', 'timestamp')
+    
     def to_dict(self):
-        return {
-            'id': self.id,
-            'project_id': self.project_id,
-            'step_id': self.step_id,
-            'user': self.user.to_dict() if self.user else None,
-            'action': self.action,
-            'step_number': self.step_number,
-            'comments': self.comments,
-            'timestamp': self.timestamp.isoformat()
-        }
+        data = column_dict(self, self._dict_columns)
+        data['user'] = self.user.to_dict() if self.user else None
+        return data
 
 
 class ProjectAsset(db.Model):
@@ -154,25 +288,19 @@ class ProjectAsset(db.Model):
     asset_type = db.Column(db.String(50), nullable=False)  # raw_footage, edited_content, final_package
     filename = db.Column(db.String(255), nullable=False)
     file_path = db.Column(db.String(500), nullable=False)
-    metadata_assets = db.Column(db.Text)  # JSON metadata_assets
+    metadata_assets = db.Column(db.JSON)  # JSON metadata_assets
     version = db.Column(db.Integer, default=1)
-    uploaded_at = db.Column(db.DateTime, default=datetime.utcnow)
+    uploaded_at = db.Column(db.DateTime(timezone=True), default=func.now())
     
     project = db.relationship('Project', backref='assets')
     uploader = db.relationship('User')
     
+    _dict_columns = ('id', 'project_id', 'asset_type', 'filename', 'file_path', 'metadata_assets', 'version', 'uploaded_at')
+    
     def to_dict(self):
-        return {
-            'id': self.id,
-            'project_id': self.project_id,
-            'uploaded_by': self.uploader.to_dict() if self.uploader else None,
-            'asset_type': self.asset_type,
-            'filename': self.filename,
-            'file_path': self.file_path,
-            'metadata_assets': json.loads(self.metadata_assets) if self.metadata_assets else None,
-            'version': self.version,
-            'uploaded_at': self.uploaded_at.isoformat()
-        }
+        data = column_dict(self, self._dict_columns)
+        data['uploaded_by'] = self.uploader.to_dict() if self.uploader else None
+        return data
 
 
 class Notification(db.Model):
@@ -182,45 +310,77 @@ class Notification(db.Model):
     project_id = db.Column(db.Integer, db.ForeignKey('project.id'))
     message = db.Column(db.Text, nullable=False)
     is_read = db.Column(db.Boolean, default=False)
-    created_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
+    created_at = db.Column(db.DateTime(timezone=True), default=func.now())
+    
+    __table_args__ = (
+        db.Index('ix_notif_user_read', 'user_id', 'is_read'),
+        db.Index('ix_notif_user_id', 'user_id', 'id'),  # Notification pages newest-first by id
+    )
     
     user = db.relationship('User')
     project = db.relationship('Project')
     
+    _dict_columns = ('id', 'user_id', 'project_id', 'message', 'is_read', 'created_at')
+    
     def to_dict(self):
-        return {
-            'id': self.id,
-            'user_id': self.user_id,
-            'project_id': self.project_id,
-            'message': self.message,
-            'is_read': self.is_read,
-            'created_at': self.created_at.isoformat()
-        }
+        return column_dict(self, self._dict_columns)
+
+
+# Eager-load everything Project.to_dict touches (owner, steps, step assignees)
+PROJECT_LOAD_OPTIONS = (
+    joinedload(Project.owner),
+    selectinload(Project.steps).joinedload(ProjectStep.assigned_user),
+)
 
 
 # ==================== AUTHENTICATION DECORATORS ====================
 
+@lru_cache(maxsize=10000)
+def decode_token(token):
+    """Verify a token's signature once per distinct token - expiry is checked by verify_token"""
+    return jwt_codec.decode(token, jwt_secret, algorithms=['HS256'], options={'verify_exp': False})
+
+
+def verify_token(token):
+    """Decode a token through the cache, still rejecting it once expired"""
+    data = decode_token(token)
+    if 'exp' in data and data['exp'] <= time.time():
+        raise jwt.ExpiredSignatureError('Signature has expired')
+    return data
+
+
+# What endpoints need about the caller - a plain tuple, safe to share across sessions
+CurrentUser = namedtuple('CurrentUser', ['id', 'username'])
+
+
+@cached(TTLCache(maxsize=10000, ttl=60), lock=threading.Lock())
+def get_current_user(user_id):
+    """Active user for a token, or None - cached for a minute, so deactivation lags by up to 60s"""
+    row = db.session.query(User.id, User.username).filter_by(id=user_id, is_active=True).first()
+    return CurrentUser(*row) if row else None
+
+
 def token_required(f):
     @wraps(f)
     def decorated(*args, **kwargs):
         token = request.headers.get('Authorization')
         
         if not token:
-            return jsonify({'error': 'Token is missing'}), 401
+            return error_response('Token is missing', 401)
         
         try:
             if token.startswith('Bearer '):
                 token = token[7:]
-            data = jwt.decode(token, app.config['SECRET_KEY'], algorithms=['HS256'])
-            current_user = db.session.get(User, data['user_id'])
+            data = verify_token(token)
+            current_user = get_current_user(data['user_id'])
             
-            if not current_user or not current_user.is_active:
-                return jsonify({'error': 'Invalid user'}), 401
+            if not current_user:
+                return error_response('Invalid user', 401)
                 
         except jwt.ExpiredSignatureError:
-            return jsonify({'error': 'Token has expired'}), 401
+            return error_response('Token has expired', 401)
         except jwt.InvalidTokenError:
-            return jsonify({'error': 'Invalid token'}), 401
+            return error_response('Invalid token', 401)
         
         return f(current_user, *args, **kwargs)
     
@@ -231,12 +391,12 @@ def project_owner_required(f):
     """Decorator to ensure only project owner can edit/delete"""
     @wraps(f)
     def decorated(current_user, project_id, *args, **kwargs):
-        project = db.session.get(Project, project_id)
+        project = lock_project(project_id)
         if not project:
-            return jsonify({'error': 'Project not found'}), 404
+            return error_response('Project not found', 404)
         
         if project.owner_id != current_user.id:
-            return jsonify({'error': 'Only project owner can perform this action'}), 403
+            return error_response('Only project owner can perform this action', 403)
         
         return f(current_user, project, *args, **kwargs)
     
@@ -246,18 +406,101 @@ def project_owner_required(f):
 # ==================== HELPER FUNCTIONS ====================
 
 def create_notification(user_id, project_id, message):
-    """Create a notification for a user"""
-    notification = Notification(
-        user_id=user_id,
-        project_id=project_id,
-        message=message
-    )
-    db.session.add(notification)
-    db.session.commit()
+    """Create a notification for a user (committed by the caller)"""
+    create_notifications([user_id], project_id, message)
+
+
+def create_notifications(user_ids, project_id, message):
+    """Create the same notification for several users with a single bulk insert"""
+    rows = [
+        {'user_id': user_id, 'project_id': project_id, 'message': message, 'is_read': False}
+        for user_id in user_ids if user_id
+    ]
+    if not rows:
+        return
+    if celery is not None:
+        # Handed to the worker once the caller's transaction commits
+        db.session.info.setdefault('pending_notifications', []).extend(rows)
+    else:
+        db.session.execute(Notification.__table__.insert(), rows)
+        mark_notifications_stale(row['user_id'] for row in rows)
+
+
+# ==================== BACKGROUND NOTIFICATIONS ====================
+
+celery = None
+if app.config['CELERY_BROKER_URL']:
+    from celery import Celery
+    from kombu.exceptions import KombuError
+    
+    celery = Celery(app.import_name, broker=app.config['CELERY_BROKER_URL'])
+    
+    @celery.task(name='deliver_notifications', ignore_result=True)
+    def deliver_notifications(rows):
+        """Insert queued notification rows outside the request that produced them"""
+        with app.app_context():
+            db.session.execute(Notification.__table__.insert(), rows)
+            mark_notifications_stale(row['user_id'] for row in rows)
+            db.session.commit()
+    
+    @event.listens_for(db.session, 'after_commit')
+    def dispatch_notifications(session):
+        """Enqueue notifications only after the workflow change they describe is committed"""
+        rows = session.info.pop('pending_notifications', None)
+        if not rows:
+            return
+        try:
+            deliver_notifications.delay(rows)
+        except KombuError as e:
+            # The workflow change is already committed - insert inline rather than lose the notifications
+            app.logger.warning('Notification broker unavailable, delivering inline: %s', e)
+            with db.engine.begin() as connection:
+                connection.execute(Notification.__table__.insert(), rows)
+            drop_cached_notifications({row['user_id'] for row in rows})
+    
+    @event.listens_for(db.session, 'after_rollback')
+    def discard_notifications(session):
+        """Drop notifications for a transaction that never happened"""
+        session.info.pop('pending_notifications', None)
+
+
+# ==================== NOTIFICATION CACHE ====================
+
+redis_client = None
+if app.config['REDIS_URL']:
+    import redis
+    
+    redis_client = redis.Redis.from_url(app.config['REDIS_URL'])
+    
+    @event.listens_for(db.session, 'after_commit')
+    def clear_notification_cache(session):
+        """Drop cached lists only after commit so a concurrent poll cannot re-cache old rows"""
+        drop_cached_notifications(session.info.pop('stale_notification_users', None))
+    
+    @event.listens_for(db.session, 'after_rollback')
+    def keep_notification_cache(session):
+        """Nothing changed - cached lists are still valid"""
+        session.info.pop('stale_notification_users', None)
+
+
+def drop_cached_notifications(user_ids):
+    """Delete the users' cached notification lists - a Redis outage only costs freshness, never the request"""
+    if redis_client is None or not user_ids:
+        return
+    try:
+        redis_client.delete(*(f'notif:{user_id}' for user_id in user_ids))
+    except redis.RedisError as e:
+        app.logger.warning('Could not invalidate cached notifications: %s', e)
+
+
+def mark_notifications_stale(user_ids):
+    """Invalidate the users' cached notification lists once the current transaction commits"""
+    if redis_client is not None:
+        db.session.info.setdefault('stale_notification_users', set()).update(user_ids)
 
 
 def log_action(project_id, user_id, action, step_number=None, step_id=None, comments=None):
-    """Log a workflow action"""
+    """Log a workflow action (committed by the caller)"""
     workflow_action = WorkflowAction(
         project_id=project_id,
         user_id=user_id,
@@ -267,7 +510,135 @@ def log_action(project_id, user_id, action, step_number=None, step_id=None, comm
         comments=comments
     )
     db.session.add(workflow_action)
-    db.session.commit()
+
+
+class ProjectBusy(Exception):
+    """Another request holds the project row lock"""
+
+
+def is_lock_unavailable(error):
+    """Whether a DBAPI error is NOWAIT finding the row locked (PostgreSQL 55P03, MySQL 3572)"""
+    orig = error.orig
+    if getattr(orig, 'pgcode', None) == '55P03' or getattr(orig, 'sqlstate', None) == '55P03':
+        return True
+    return bool(orig.args) and orig.args[0] == 3572
+
+
+def lock_project(project_id):
+    """Load a project for a mutation, row-locked until commit so concurrent transitions serialize"""
+    try:
+        return db.session.get(Project, project_id, with_for_update={'nowait': True})
+    except OperationalError as e:  # SQLite has no FOR UPDATE, so this is only ever a server database
+        if not is_lock_unavailable(e):
+            raise  # Connection loss, disk errors etc. are not a busy project
+        db.session.rollback()
+        raise ProjectBusy()
+
+
+@app.errorhandler(ProjectBusy)
+def project_busy(error):
+    return error_response('Project is being updated by another request, please retry', 409)
+
+
+def validate_steps(steps):
+    """Error response for an invalid steps payload, or None if it can be saved"""
+    if not steps:
+        return error_response('At least one step is required', 400)
+    
+    for step_data in steps:
+        if not all(k in step_data for k in ['step_number', 'step_name', 'task_description', 'assigned_user_id']):
+            return error_response('Invalid step data', 400)
+        
+        # Check if assigned user exists (SQLite does not enforce the foreign key)
+        if not db.session.get(User, step_data['assigned_user_id']):
+            return jsonify({'error': f'User {step_data["assigned_user_id"]} not found'}), 404
+    
+    if len({s['step_number'] for s in steps}) != len(steps):
+        return error_response('Step numbers must be unique', 400)
+    
+    return None
+
+
+def build_step_rows(project_id, steps_data, active_step_number=None):
+    """Build ProjectStep rows for a bulk insert; the active step starts In Progress"""
+    return [
+        {
+            'project_id': project_id,
+            'step_number': step_data['step_number'],
+            'step_name': step_data['step_name'],
+            'task_description': step_data['task_description'],
+            'assigned_user_id': step_data['assigned_user_id'],
+            'status': 'In Progress' if step_data['step_number'] == active_step_number else 'Pending'
+        }
+        for step_data in steps_data
+    ]
+
+
+def load_project(project_id):
+    """Load a project with its steps and users for to_dict (refreshes expired state)"""
+    return Project.query.options(*PROJECT_LOAD_OPTIONS).populate_existing().filter_by(id=project_id).first()
+
+
+def accessible_by(user_id):
+    """SQL condition for projects a user owns or is assigned to a step of"""
+    assigned_project_ids = select(ProjectStep.project_id).where(ProjectStep.assigned_user_id == user_id)
+    return or_(Project.owner_id == user_id, Project.id.in_(assigned_project_ids))
+
+
+def load_project_with_access(project_id, user_id, *options):
+    """Load a project and whether the user may access it in one query; (None, False) if missing"""
+    row = db.session.execute(
+        select(Project, accessible_by(user_id)).options(*options).where(Project.id == project_id)
+    ).one_or_none()
+    return tuple(row) if row else (None, False)
+
+
+def paginate(query, cursor_col, descending=False):
+    """Keyset-paginate a query on a unique indexed column using ?cursor=&limit="""
+    limit = max(1, min(request.args.get('limit', 50, type=int), 200))
+    cursor = request.args.get('cursor', type=int)
+    
+    if cursor is not None:
+        query = query.filter(cursor_col < cursor if descending else cursor_col > cursor)
+    
+    # Fetch one extra row to learn whether another page exists
+    items = query.order_by(cursor_col.desc() if descending else cursor_col.asc()).limit(limit + 1).all()
+    next_cursor = getattr(items[limit - 1], cursor_col.key) if len(items) > limit else None
+    return items[:limit], next_cursor
+
+
+# Only Linux sendfile() accepts a regular file as the destination - macOS/BSD require a socket
+SENDFILE_TO_FILE = sys.platform.startswith('linux') and hasattr(os, 'sendfile')
+
+
+def spooled_to_disk(stream):
+    """Whether an upload stream is already backed by a real file descriptor"""
+    if isinstance(stream, tempfile.SpooledTemporaryFile):
+        # No public rollover flag, and fileno() itself forces the rollover - the
+        # private _file is an in-memory buffer until Werkzeug's 500KB threshold
+        return not isinstance(stream._file, (io.BytesIO, io.StringIO))
+    return hasattr(stream, 'fileno')
+
+
+def save_upload(file, path):
+    """Write an uploaded file to disk without copying it through Python chunk by chunk"""
+    stream = file.stream
+    with open(path, 'wb') as out:
+        if SENDFILE_TO_FILE and spooled_to_disk(stream):
+            # Large uploads are spooled to a temp file - let the kernel copy it
+            offset = stream.tell()
+            try:
+                in_fd = stream.fileno()
+                while True:
+                    sent = os.sendfile(out.fileno(), in_fd, offset, app.config['UPLOAD_BUFFER_SIZE'] * 64)
+                    if not sent:
+                        return
+                    offset += sent
+            except OSError:
+                if out.tell():
+                    raise  # Failed part-way through (e.g. disk full), not an unsupported copy
+                # e.g. EINVAL on filesystems without sendfile support - stream position is untouched
+        shutil.copyfileobj(stream, out, app.config['UPLOAD_BUFFER_SIZE'])
 
 
 def get_current_step(project):
@@ -280,13 +651,18 @@ def get_current_step(project):
     ).first()
 
 
-def get_next_step(project):
-    """Get the next step (lower number) in the workflow"""
+def get_current_and_next_step(project):
+    """Get the current step and the next step (lower number) in a single query"""
     if not project.current_step_number:
-        return None
-    return ProjectStep.query.filter_by(project_id=project.id).filter(
-        ProjectStep.step_number < project.current_step_number
-    ).order_by(ProjectStep.step_number.desc()).first()
+        return None, None
+    steps = ProjectStep.query.filter(
+        ProjectStep.project_id == project.id,
+        ProjectStep.step_number <= project.current_step_number
+    ).order_by(ProjectStep.step_number.desc()).limit(2).all()
+    
+    if not steps or steps[0].step_number != project.current_step_number:
+        return None, None
+    return steps[0], steps[1] if len(steps) > 1 else None
 
 
 def get_previous_step(project):
@@ -312,13 +688,18 @@ def register():
     
     required_fields = ['username', 'email', 'password', 'full_name']
     if not all(field in data for field in required_fields):
-        return jsonify({'error': 'Missing required fields'}), 400
+        return error_response('Missing required fields', 400)
+    
+    # One lookup for both unique fields (at most two rows can match)
+    existing = User.query.with_entities(User.username, User.email).filter(
+        (User.username == data['username']) | (User.email == data['email'])
+    ).all()
     
-    if User.query.filter_by(username=data['username']).first():
-        return jsonify({'error': 'Username already exists'}), 400
+    if any(row.username == data['username'] for row in existing):
+        return error_response('Username already exists', 400)
     
-    if User.query.filter_by(email=data['email']).first():
-        return jsonify({'error': 'Email already exists'}), 400
+    if existing:
+        return error_response('Email already exists', 400)
     
     user = User(
         username=data['username'],
@@ -328,7 +709,12 @@ def register():
     user.set_password(data['password'])
     
     db.session.add(user)
-    db.session.commit()
+    try:
+        db.session.commit()
+    except IntegrityError:
+        # Lost a race with a concurrent registration
+        db.session.rollback()
+        return error_response('Username or email already exists', 400)
     
     return jsonify({
         'message': 'User registered successfully',
@@ -342,17 +728,21 @@ def login():
     data = request.get_json()
     
     if not data.get('username') or not data.get('password'):
-        return jsonify({'error': 'Username and password required'}), 400
+        return error_response('Username and password required', 400)
     
     user = User.query.filter_by(username=data['username']).first()
     
     if not user or not user.check_password(data['password']) or not user.is_active:
-        return jsonify({'error': 'Invalid credentials'}), 401
+        return error_response('Invalid credentials', 401)
+    
+    # Persist a rehashed password (legacy scheme or changed cost)
+    if db.session.is_modified(user):
+        db.session.commit()
     
-    token = jwt.encode({
+    token = jwt_codec.encode({
         'user_id': user.id,
         'exp': datetime.now(timezone.utc) + timedelta(days=1)
-    }, app.config['SECRET_KEY'], algorithm='HS256')
+    }, jwt_secret, algorithm='HS256')
     
     return jsonify({
         'token': token,
@@ -363,9 +753,12 @@ def login():
 @app.route('/api/users', methods=['GET'])
 @token_required
 def get_users(current_user):
-    """Get all active users except current user"""
-    users = User.query.filter(User.is_active == True).all()
-    return jsonify([user.to_dict() for user in users]), 200
+    """Get active users, one page at a time"""
+    users, next_cursor = paginate(User.query.filter(User.is_active == True), User.id)
+    return jsonify({
+        'items': [user.to_dict() for user in users],
+        'next': next_cursor
+    }), 200
 
 
 # ==================== ROUTES - WORKFLOW ====================
@@ -378,20 +771,11 @@ def create_project(current_user):
     
     required_fields = ['project_name', 'description', 'steps']
     if not all(field in data for field in required_fields):
-        return jsonify({'error': 'Missing required fields'}), 400
+        return error_response('Missing required fields', 400)
     
-    if not data['steps'] or len(data['steps']) == 0:
-        return jsonify({'error': 'At least one step is required'}), 400
-    
-    # Validate steps
-    for step_data in data['steps']:
-        if not all(k in step_data for k in ['step_number', 'step_name', 'task_description', 'assigned_user_id']):
-            return jsonify({'error': 'Invalid step data'}), 400
-        
-        # Check if assigned user exists
-        assigned_user = User.query.get(step_data['assigned_user_id'])
-        if not assigned_user:
-            return jsonify({'error': f'User {step_data["assigned_user_id"]} not found'}), 404
+    error = validate_steps(data['steps'])
+    if error:
+        return error
     
     # Create project
     project = Project(
@@ -404,47 +788,30 @@ def create_project(current_user):
     db.session.add(project)
     db.session.flush()  # Get project ID
     
-    # Create steps
+    # Create steps in one executemany - highest number is where work starts
     highest_step = max([s['step_number'] for s in data['steps']])
-    
-    for step_data in data['steps']:
-        step = ProjectStep(
-            project_id=project.id,
-            step_number=step_data['step_number'],
-            step_name=step_data['step_name'],
-            task_description=step_data['task_description'],
-            assigned_user_id=step_data['assigned_user_id'],
-            status='Pending'
-        )
-        db.session.add(step)
+    step_rows = build_step_rows(project.id, data['steps'], active_step_number=highest_step)
+    db.session.execute(ProjectStep.__table__.insert(), step_rows)
     
     # Set current step to highest number (work starts here)
     project.current_step_number = highest_step
-    
-    # Mark highest step as In Progress
-    highest_step_obj = ProjectStep.query.filter_by(
-        project_id=project.id,
-        step_number=highest_step
-    ).first()
-    if highest_step_obj:
-        highest_step_obj.status = 'In Progress'
-    
-    db.session.commit()
+    highest_step_row = next(row for row in step_rows if row['step_number'] == highest_step)
     
     # Log action
     log_action(project.id, current_user.id, 'create', step_number=None, comments='Project created')
     
     # Notify the user assigned to the highest step
-    if highest_step_obj:
-        create_notification(
-            highest_step_obj.assigned_user_id,
-            project.id,
-            f'New project assigned: {project.project_name}. You are at Step {highest_step}: {highest_step_obj.step_name}'
-        )
+    create_notification(
+        highest_step_row['assigned_user_id'],
+        project.id,
+        f'New project assigned: {project.project_name}. You are at Step {highest_step}: {highest_step_row["step_name"]}'
+    )
+    
+    db.session.commit()
     
     return jsonify({
         'message': 'Project created successfully',
-        'project': project.to_dict()
+        'project': load_project(project.id).to_dict()
     }), 201
 
 
@@ -455,6 +822,12 @@ def edit_project(current_user, project):
     """Edit project details and steps - only owner can edit"""
     data = request.get_json()
     
+    # Validate the whole payload before touching the project
+    if 'steps' in data:
+        error = validate_steps(data['steps'])
+        if error:
+            return error
+    
     # Update basic project info
     if 'project_name' in data:
         project.project_name = data['project_name']
@@ -464,37 +837,46 @@ def edit_project(current_user, project):
     
     # Update steps if provided
     if 'steps' in data:
-        # Delete existing steps
-        ProjectStep.query.filter_by(project_id=project.id).delete()
+        # Diff against existing steps by number: update in place, insert new, delete removed
+        highest_step = max([s['step_number'] for s in data['steps']])
+        existing_steps = {step.step_number: step for step in project.steps}
+        new_steps = []
         
-        # Create new steps
         for step_data in data['steps']:
-            if not all(k in step_data for k in ['step_number', 'step_name', 'task_description', 'assigned_user_id']):
-                return jsonify({'error': 'Invalid step data'}), 400
+            step = existing_steps.pop(step_data['step_number'], None)
+            if step is None:
+                new_steps.append(step_data)
+                continue
             
-            step = ProjectStep(
-                project_id=project.id,
-                step_number=step_data['step_number'],
-                step_name=step_data['step_name'],
-                task_description=step_data['task_description'],
-                assigned_user_id=step_data['assigned_user_id'],
-                status='Pending'
+            # Only changed attributes end up in the UPDATE
+            step.step_name = step_data['step_name']
+            step.task_description = step_data['task_description']
+            step.assigned_user_id = step_data['assigned_user_id']
+            step.status = 'In Progress' if step.step_number == highest_step else 'Pending'
+            step.completed_at = None
+        
+        for step in existing_steps.values():
+            project.steps.remove(step)  # delete-orphan cascade issues the DELETE
+        
+        if new_steps:
+            db.session.execute(
+                ProjectStep.__table__.insert(),
+                build_step_rows(project.id, new_steps, active_step_number=highest_step)
             )
-            db.session.add(step)
         
         # Reset to highest step
-        highest_step = max([s['step_number'] for s in data['steps']])
         project.current_step_number = highest_step
     
-    project.updated_at = datetime.utcnow()
-    db.session.commit()
+    project.updated_at = func.now()
     
     # Log action
     log_action(project.id, current_user.id, 'edit', comments='Project edited')
     
+    db.session.commit()
+    
     return jsonify({
         'message': 'Project updated successfully',
-        'project': project.to_dict()
+        'project': load_project(project.id).to_dict()
     }), 200
 
 
@@ -511,10 +893,13 @@ def delete_project(current_user, project):
         project_id = project.id
 
         # 1. Clean up physical files from the 'uploads' folder
-        assets = ProjectAsset.query.filter_by(project_id=project_id).all()
-        for asset in assets:
+        # Only the stored filenames are needed - no ProjectAsset instances
+        asset_paths = db.session.scalars(
+            select(ProjectAsset.file_path).where(ProjectAsset.project_id == project_id)
+        ).all()
+        for asset_path in asset_paths:
             # Construct the absolute path to the file
-            file_path = os.path.join(app.config['UPLOAD_FOLDER'], asset.file_path)
+            file_path = os.path.join(app.config['UPLOAD_FOLDER'], asset_path)
             if os.path.exists(file_path):
                 try:
                     os.remove(file_path)
@@ -523,6 +908,11 @@ def delete_project(current_user, project):
                     print(f"Error deleting file {file_path}: {e}")
 
         # 2. Clean up Notifications (manually, as they might not be cascaded)
+        if redis_client is not None:
+            # Bulk delete skips the ORM - drop the recipients' cached lists explicitly
+            mark_notifications_stale(db.session.scalars(
+                select(Notification.user_id).where(Notification.project_id == project_id).distinct()
+            ).all())
         Notification.query.filter_by(project_id=project_id).delete()
 
         # 3. Clean up Workflow Actions
@@ -546,28 +936,25 @@ def delete_project(current_user, project):
 @token_required
 def forward_step(current_user, project_id):
     """Forward project to next step (lower step number)"""
-    project = db.session.get(Project, project_id)
+    project = lock_project(project_id)
     if not project:
-        return jsonify({'error': 'Project not found'}), 404
+        return error_response('Project not found', 404)
     
-    # Get current step
-    current_step = get_current_step(project)
+    # Get current step and next step (lower number) together
+    current_step, next_step = get_current_and_next_step(project)
     if not current_step:
-        return jsonify({'error': 'No active step found'}), 400
+        return error_response('No active step found', 400)
     
     # Verify user is assigned to current step
     if current_step.assigned_user_id != current_user.id:
-        return jsonify({'error': 'You are not assigned to the current step'}), 403
+        return error_response('You are not assigned to the current step', 403)
     
     data = request.get_json() or {}
     comments = data.get('comments', '')
     
     # Mark current step as completed
     current_step.status = 'Completed'
-    current_step.completed_at = datetime.utcnow()
-    
-    # Get next step (lower number)
-    next_step = get_next_step(project)
+    current_step.completed_at = func.now()
     
     if next_step:
         # Move to next step
@@ -595,7 +982,7 @@ def forward_step(current_user, project_id):
         
         return jsonify({
             'message': f'Project forwarded to Step {next_step.step_number}',
-            'project': project.to_dict()
+            'project': load_project(project.id).to_dict()
         }), 200
     else:
         # No more steps - project reaches owner (Step 1)
@@ -623,7 +1010,7 @@ def forward_step(current_user, project_id):
         
         return jsonify({
             'message': 'Project completed successfully',
-            'project': project.to_dict()
+            'project': load_project(project.id).to_dict()
         }), 200
 
 
@@ -631,22 +1018,22 @@ def forward_step(current_user, project_id):
 @token_required
 def send_back_step(current_user, project_id):
     """Send project back to previous step (higher step number)"""
-    project = db.session.get(Project, project_id)
+    project = lock_project(project_id)
     if not project:
-        return jsonify({'error': 'Project not found'}), 404
+        return error_response('Project not found', 404)
     
     # Get current step
     current_step = get_current_step(project)
     if not current_step:
-        return jsonify({'error': 'No active step found'}), 400
+        return error_response('No active step found', 400)
     
     # Verify user is assigned to current step
     if current_step.assigned_user_id != current_user.id:
-        return jsonify({'error': 'You are not assigned to the current step'}), 403
+        return error_response('You are not assigned to the current step', 403)
     
     data = request.get_json()
     if not data or not data.get('comments'):
-        return jsonify({'error': 'Comments are required when sending back'}), 400
+        return error_response('Comments are required when sending back', 400)
     
     comments = data['comments']
     
@@ -654,7 +1041,7 @@ def send_back_step(current_user, project_id):
     previous_step = get_previous_step(project)
     
     if not previous_step:
-        return jsonify({'error': 'No previous step to send back to'}), 400
+        return error_response('No previous step to send back to', 400)
     
     # Mark current step as sent back
     current_step.status = 'Sent Back'
@@ -685,7 +1072,7 @@ def send_back_step(current_user, project_id):
     
     return jsonify({
         'message': f'Project sent back to Step {previous_step.step_number}',
-        'project': project.to_dict()
+        'project': load_project(project.id).to_dict()
     }), 200
     """Step 1: Manager initiates a project"""
     data = request.get_json()
@@ -695,13 +1082,13 @@ def send_back_step(current_user, project_id):
                       'step5_user_id', 'step6_user_id']
     
     if not all(field in data for field in required_fields):
-        return jsonify({'error': 'Missing required fields'}), 400
+        return error_response('Missing required fields', 400)
     
     # Validate deadline
     try:
         deadline = datetime.fromisoformat(data['deadline'].replace('Z', '+00:00'))
     except ValueError:
-        return jsonify({'error': 'Invalid deadline format'}), 400
+        return error_response('Invalid deadline format', 400)
     
     # Validate assigned users exist
     for step in range(2, 7):
@@ -748,23 +1135,26 @@ def send_back_step(current_user, project_id):
 def upload_raw(current_user):
     """Step 6: Reporter uploads raw footage"""
     project_id = request.form.get('project_id')
-    metadata_assets = request.form.get('metadata_assets', '{}')
+    try:
+        metadata_assets = orjson.loads(request.form.get('metadata_assets') or '{}')
+    except ValueError:
+        return error_response('Invalid metadata_assets JSON', 400)
     
     if not project_id:
-        return jsonify({'error': 'Project ID required'}), 400
+        return error_response('Project ID required', 400)
     
-    project = db.session.get(Project, project_id)
+    project = lock_project(project_id)
     if not project:
-        return jsonify({'error': 'Project not found'}), 404
+        return error_response('Project not found', 404)
     
     if project.step6_user_id != current_user.id:
-        return jsonify({'error': 'You are not assigned to this project'}), 403
+        return error_response('You are not assigned to this project', 403)
     
     if project.current_step != 6:
-        return jsonify({'error': 'Project is not at Step 6'}), 400
+        return error_response('Project is not at Step 6', 400)
     
     if 'files[]' not in request.files:
-        return jsonify({'error': 'No files uploaded'}), 400
+        return error_response('No files uploaded', 400)
     
     files = request.files.getlist('files[]')
     uploaded_assets = []
@@ -775,7 +1165,7 @@ def upload_raw(current_user):
         
         filename = secure_filename(file.filename)
         file_path = os.path.join(app.config['UPLOAD_FOLDER'], f"{project_id}_{filename}")
-        file.save(file_path)
+        save_upload(file, file_path)
         
         asset = ProjectAsset(
             project_id=project.id,
@@ -792,8 +1182,7 @@ def upload_raw(current_user):
     old_status = project.status
     project.status = 'In Progress'
     project.current_step = 5
-    project.updated_at = datetime.utcnow()
-    db.session.commit()
+    project.updated_at = func.now()
     
     # Log action
     log_action(project.id, current_user.id, 'upload-raw', 6, old_status, 'In Progress')
@@ -805,6 +1194,8 @@ def upload_raw(current_user):
         f'Raw footage uploaded for project: {project.project_name}. Ready for editing.'
     )
     
+    db.session.commit()
+    
     return jsonify({
         'message': 'Raw footage uploaded successfully',
         'project': project.to_dict(),
@@ -821,20 +1212,20 @@ def edit_content(current_user):
     comments = request.form.get('comments', '')
     
     if not project_id:
-        return jsonify({'error': 'Project ID required'}), 400
+        return error_response('Project ID required', 400)
     
-    project = db.session.get(Project, project_id)
+    project = lock_project(project_id)
     if not project:
-        return jsonify({'error': 'Project not found'}), 404
+        return error_response('Project not found', 404)
     
     if project.step5_user_id != current_user.id:
-        return jsonify({'error': 'You are not assigned to this project'}), 403
+        return error_response('You are not assigned to this project', 403)
     
     if project.current_step != 5:
-        return jsonify({'error': 'Project is not at Step 5'}), 400
+        return error_response('Project is not at Step 5', 400)
     
     if 'files[]' not in request.files:
-        return jsonify({'error': 'No edited content uploaded'}), 400
+        return error_response('No edited content uploaded', 400)
     
     files = request.files.getlist('files[]')
     uploaded_assets = []
@@ -845,7 +1236,7 @@ def edit_content(current_user):
         
         filename = secure_filename(file.filename)
         file_path = os.path.join(app.config['UPLOAD_FOLDER'], f"{project_id}_edited_{filename}")
-        file.save(file_path)
+        save_upload(file, file_path)
         
         asset = ProjectAsset(
             project_id=project.id,
@@ -853,7 +1244,7 @@ def edit_content(current_user):
             asset_type='edited_content',
             filename=filename,
             file_path=file_path,
-            metadata_assets=json.dumps({'comments': comments})
+            metadata_assets={'comments': comments}
         )
         db.session.add(asset)
         uploaded_assets.append(asset)
@@ -862,8 +1253,7 @@ def edit_content(current_user):
     old_status = project.status
     project.status = 'Submitted'
     project.current_step = 4
-    project.updated_at = datetime.utcnow()
-    db.session.commit()
+    project.updated_at = func.now()
     
     # Log action
     log_action(project.id, current_user.id, 'edit-content', 5, old_status, 'Submitted', comments)
@@ -875,6 +1265,8 @@ def edit_content(current_user):
         f'Edited content ready for quality verification: {project.project_name}'
     )
     
+    db.session.commit()
+    
     return jsonify({
         'message': 'Edited content submitted successfully',
         'project': project.to_dict()
@@ -888,17 +1280,17 @@ def verify_quality(current_user):
     data = request.get_json()
     
     if not data.get('project_id'):
-        return jsonify({'error': 'Project ID required'}), 400
+        return error_response('Project ID required', 400)
     
-    project = Project.query.get(data['project_id'])
+    project = lock_project(data['project_id'])
     if not project:
-        return jsonify({'error': 'Project not found'}), 404
+        return error_response('Project not found', 404)
     
     if project.step4_user_id != current_user.id:
-        return jsonify({'error': 'You are not assigned to this project'}), 403
+        return error_response('You are not assigned to this project', 403)
     
     if project.current_step != 4:
-        return jsonify({'error': 'Project is not at Step 4'}), 400
+        return error_response('Project is not at Step 4', 400)
     
     approved = data.get('approved', False)
     comments = data.get('comments', '')
@@ -908,7 +1300,7 @@ def verify_quality(current_user):
     if approved:
         project.status = 'Submitted'
         project.current_step = 3
-        project.updated_at = datetime.utcnow()
+        project.updated_at = func.now()
         
         # Notify Checker 02 (Step 3)
         create_notification(
@@ -921,7 +1313,7 @@ def verify_quality(current_user):
     else:
         # Reject - send back to Editor (Step 5)
         project.current_step = 5
-        project.updated_at = datetime.utcnow()
+        project.updated_at = func.now()
         
         # Notify Editor
         create_notification(
@@ -932,11 +1324,11 @@ def verify_quality(current_user):
         
         message = 'Content rejected, sent back to Editor'
     
-    db.session.commit()
-    
     # Log action
     log_action(project.id, current_user.id, 'verify-quality', 4, old_status, project.status, comments)
     
+    db.session.commit()
+    
     return jsonify({
         'message': message,
         'project': project.to_dict()
@@ -950,17 +1342,17 @@ def verify_policy(current_user):
     data = request.get_json()
     
     if not data.get('project_id'):
-        return jsonify({'error': 'Project ID required'}), 400
+        return error_response('Project ID required', 400)
     
-    project = Project.query.get(data['project_id'])
+    project = lock_project(data['project_id'])
     if not project:
-        return jsonify({'error': 'Project not found'}), 404
+        return error_response('Project not found', 404)
     
     if project.step3_user_id != current_user.id:
-        return jsonify({'error': 'You are not assigned to this project'}), 403
+        return error_response('You are not assigned to this project', 403)
     
     if project.current_step != 3:
-        return jsonify({'error': 'Project is not at Step 3'}), 400
+        return error_response('Project is not at Step 3', 400)
     
     approved = data.get('approved', False)
     comments = data.get('comments', '')
@@ -970,7 +1362,7 @@ def verify_policy(current_user):
     if approved:
         project.status = 'Edited'
         project.current_step = 2
-        project.updated_at = datetime.utcnow()
+        project.updated_at = func.now()
         
         # Notify Automation Layer (Step 2)
         create_notification(
@@ -983,7 +1375,7 @@ def verify_policy(current_user):
     else:
         # Reject - send back to Checker 01 (Step 4)
         project.current_step = 4
-        project.updated_at = datetime.utcnow()
+        project.updated_at = func.now()
         
         # Notify Checker 01
         create_notification(
@@ -994,11 +1386,11 @@ def verify_policy(current_user):
         
         message = 'Content rejected, sent back to Checker 01'
     
-    db.session.commit()
-    
     # Log action
     log_action(project.id, current_user.id, 'verify-policy', 3, old_status, project.status, comments)
     
+    db.session.commit()
+    
     return jsonify({
         'message': message,
         'project': project.to_dict()
@@ -1012,25 +1404,24 @@ def log_and_prep(current_user):
     data = request.get_json()
     
     if not data.get('project_id'):
-        return jsonify({'error': 'Project ID required'}), 400
+        return error_response('Project ID required', 400)
     
-    project = Project.query.get(data['project_id'])
+    project = lock_project(data['project_id'])
     if not project:
-        return jsonify({'error': 'Project not found'}), 404
+        return error_response('Project not found', 404)
     
     if project.step2_user_id != current_user.id:
-        return jsonify({'error': 'You are not assigned to this project'}), 403
+        return error_response('You are not assigned to this project', 403)
     
     if project.current_step != 2:
-        return jsonify({'error': 'Project is not at Step 2'}), 400
+        return error_response('Project is not at Step 2', 400)
     
     comments = data.get('comments', '')
     
     old_status = project.status
     project.status = 'Edited'
     project.current_step = 1
-    project.updated_at = datetime.utcnow()
-    db.session.commit()
+    project.updated_at = func.now()
     
     # Log action
     log_action(project.id, current_user.id, 'log-and-prep', 2, old_status, 'Edited', comments)
@@ -1042,6 +1433,8 @@ def log_and_prep(current_user):
         f'Final package prepared for project: {project.project_name}. Ready for approval.'
     )
     
+    db.session.commit()
+    
     return jsonify({
         'message': 'Package logged and prepared successfully',
         'project': project.to_dict()
@@ -1055,17 +1448,17 @@ def approve_project(current_user):
     data = request.get_json()
     
     if not data.get('project_id'):
-        return jsonify({'error': 'Project ID required'}), 400
+        return error_response('Project ID required', 400)
     
-    project = Project.query.get(data['project_id'])
+    project = lock_project(data['project_id'])
     if not project:
-        return jsonify({'error': 'Project not found'}), 404
+        return error_response('Project not found', 404)
     
     if project.created_by != current_user.id:
-        return jsonify({'error': 'You are not the project creator'}), 403
+        return error_response('You are not the project creator', 403)
     
     if project.current_step != 1:
-        return jsonify({'error': 'Project is not ready for approval'}), 400
+        return error_response('Project is not ready for approval', 400)
     
     approved = data.get('approved', False)
     comments = data.get('comments', '')
@@ -1076,26 +1469,23 @@ def approve_project(current_user):
     if approved:
         project.status = 'Approved'
         project.current_step = 0  # Workflow complete
-        project.updated_at = datetime.utcnow()
+        project.updated_at = func.now()
         
         # Simulate publishing
         project.status = 'Published'
         
-        # Notify all team members
-        for step in range(2, 7):
-            user_id = getattr(project, f'step{step}_user_id')
-            if user_id:
-                create_notification(
-                    user_id,
-                    project.id,
-                    f'Project published: {project.project_name} on platforms: {", ".join(platforms)}'
-                )
+        # Notify all team members in one executemany
+        create_notifications(
+            [getattr(project, f'step{step}_user_id') for step in range(2, 7)],
+            project.id,
+            f'Project published: {project.project_name} on platforms: {", ".join(platforms)}'
+        )
         
         message = f'Project approved and published to: {", ".join(platforms)}'
     else:
         # Reject - send back to Automation (Step 2)
         project.current_step = 2
-        project.updated_at = datetime.utcnow()
+        project.updated_at = func.now()
         
         # Notify Automation
         create_notification(
@@ -1106,11 +1496,11 @@ def approve_project(current_user):
         
         message = 'Project rejected, sent back to Automation Layer'
     
-    db.session.commit()
-    
     # Log action
     log_action(project.id, current_user.id, 'approve', 1, old_status, project.status, comments)
     
+    db.session.commit()
+    
     return jsonify({
         'message': message,
         'project': project.to_dict()
@@ -1122,38 +1512,27 @@ def approve_project(current_user):
 @app.route('/api/projects', methods=['GET'])
 @token_required
 def get_projects(current_user):
-    """Get all projects where user is owner or assigned to a step"""
-    # Get projects owned by user
-    owned_projects = Project.query.filter_by(owner_id=current_user.id).all()
-    
-    # Get projects where user is assigned to any step
-    assigned_steps = ProjectStep.query.filter_by(assigned_user_id=current_user.id).all()
-    assigned_project_ids = [step.project_id for step in assigned_steps]
-    assigned_projects = Project.query.filter(Project.id.in_(assigned_project_ids)).all() if assigned_project_ids else []
+    """Get projects where user is owner or assigned to a step, newest first"""
+    query = Project.query.options(*PROJECT_LOAD_OPTIONS).filter(accessible_by(current_user.id))
+    projects, next_cursor = paginate(query, Project.id, descending=True)
     
-    # Combine and deduplicate
-    all_projects = {p.id: p for p in owned_projects + assigned_projects}
-    
-    return jsonify([p.to_dict() for p in all_projects.values()]), 200
+    return jsonify({
+        'items': [p.to_dict() for p in projects],
+        'next': next_cursor
+    }), 200
 
 
 @app.route('/api/projects/<int:project_id>', methods=['GET'])
 @token_required
 def get_project(current_user, project_id):
     """Get single project details"""
-    project = db.session.get(Project, project_id)
+    project, has_access = load_project_with_access(project_id, current_user.id, *PROJECT_LOAD_OPTIONS)
     if not project:
-        return jsonify({'error': 'Project not found'}), 404
-    
-    # Check if user has access (owner or assigned to any step)
-    is_owner = project.owner_id == current_user.id
-    is_assigned = ProjectStep.query.filter_by(
-        project_id=project_id,
-        assigned_user_id=current_user.id
-    ).first() is not None
+        return error_response('Project not found', 404)
     
-    if not (is_owner or is_assigned):
-        return jsonify({'error': 'Access denied'}), 403
+    # Owner or assigned to any step
+    if not has_access:
+        return error_response('Access denied', 403)
     
     return jsonify(project.to_dict()), 200
 
@@ -1162,46 +1541,83 @@ def get_project(current_user, project_id):
 @token_required
 def get_project_actions(current_user, project_id):
     """Get workflow actions (audit trail) for a project"""
-    project = db.session.get(Project, project_id)
+    project, has_access = load_project_with_access(project_id, current_user.id)
     if not project:
-        return jsonify({'error': 'Project not found'}), 404
+        return error_response('Project not found', 404)
+    
+    if not has_access:
+        return error_response('Access denied', 403)
     
-    actions = WorkflowAction.query.filter_by(project_id=project_id).order_by(WorkflowAction.timestamp.desc()).all()
-    return jsonify([action.to_dict() for action in actions]), 200
+    # Newest first; ids grow with insertion time so they double as the cursor
+    query = WorkflowAction.query.options(joinedload(WorkflowAction.user)).filter_by(project_id=project_id)
+    actions, next_cursor = paginate(query, WorkflowAction.id, descending=True)
+    
+    return jsonify({
+        'items': [action.to_dict() for action in actions],
+        'next': next_cursor
+    }), 200
 
 
 @app.route('/api/projects/<int:project_id>/assets', methods=['GET'])
 @token_required
 def get_project_assets(current_user, project_id):
     """Get all assets for a project"""
-    project = db.session.get(Project, project_id)
+    project, has_access = load_project_with_access(project_id, current_user.id)
     if not project:
-        return jsonify({'error': 'Project not found'}), 404
+        return error_response('Project not found', 404)
+    
+    if not has_access:
+        return error_response('Access denied', 403)
     
-    assets = ProjectAsset.query.filter_by(project_id=project_id).order_by(ProjectAsset.uploaded_at.desc()).all()
+    assets = ProjectAsset.query.options(joinedload(ProjectAsset.uploader)).filter_by(
+        project_id=project_id
+    ).order_by(ProjectAsset.uploaded_at.desc(), ProjectAsset.id.desc()).all()
     return jsonify([asset.to_dict() for asset in assets]), 200
 
 
 @app.route('/api/notifications', methods=['GET'])
 @token_required
 def get_notifications(current_user):
-    """Get user notifications"""
-    notifications = Notification.query.filter_by(user_id=current_user.id).order_by(Notification.created_at.desc()).limit(50).all()
-    return jsonify([notif.to_dict() for notif in notifications]), 200
+    """Get user notifications, newest first (paginated)"""
+    # The UI polls the first page - serve it from Redis until it changes or expires
+    cache_key = f'notif:{current_user.id}'
+    use_cache = redis_client is not None and not request.args
+    if use_cache:
+        try:
+            payload = redis_client.get(cache_key)
+        except redis.RedisError as e:
+            app.logger.warning('Notification cache unavailable: %s', e)
+            payload = None
+        if payload is not None:
+            return app.response_class(payload, mimetype='application/json'), 200
+    
+    query = Notification.query.filter_by(user_id=current_user.id)
+    notifications, next_cursor = paginate(query, Notification.id, descending=True)
+    response = jsonify({
+        'items': [notif.to_dict() for notif in notifications],
+        'next': next_cursor
+    })
+    if use_cache:
+        try:
+            redis_client.setex(cache_key, app.config['NOTIFICATION_CACHE_TTL'], response.get_data())
+        except redis.RedisError as e:
+            app.logger.warning('Notification cache unavailable: %s', e)
+    return response, 200
 
 
 @app.route('/api/notifications/<int:notif_id>/read', methods=['PUT'])
 @token_required
 def mark_notification_read(current_user, notif_id):
     """Mark notification as read"""
-    notification = Notification.query.get(notif_id)
+    notification = db.session.get(Notification, notif_id)
     if not notification:
-        return jsonify({'error': 'Notification not found'}), 404
+        return error_response('Notification not found', 404)
     
     if notification.user_id != current_user.id:
-        return jsonify({'error': 'Access denied'}), 403
+        return error_response('Access denied', 403)
     
     notification.is_read = True
+    mark_notifications_stale([current_user.id])
     db.session.commit()
     
     return jsonify({'message': 'Notification marked as read'}), 200
@@ -1210,47 +1626,37 @@ def mark_notification_read(current_user, notif_id):
 @app.route('/api/dashboard/stats', methods=['GET'])
 @token_required
 def get_dashboard_stats(current_user):
-    """Get dashboard statistics"""
-    # Projects owned by user
-    owned_projects = Project.query.filter_by(owner_id=current_user.id).count()
-    
-    # Projects where user is assigned
-    assigned_steps = ProjectStep.query.filter_by(assigned_user_id=current_user.id).all()
-    assigned_project_ids = [step.project_id for step in assigned_steps]
-    assigned_projects_count = len(set(assigned_project_ids))
-    
-    total_projects = owned_projects + assigned_projects_count
-    
-    # Active projects (In Progress status)
-    active_owned = Project.query.filter_by(owner_id=current_user.id, status='In Progress').count()
-    active_assigned = Project.query.filter(
-        Project.id.in_(assigned_project_ids),
-        Project.status == 'In Progress'
-    ).count() if assigned_project_ids else 0
-    active_projects = active_owned + active_assigned
-    
-    # Completed projects
-    completed_owned = Project.query.filter_by(owner_id=current_user.id, status='Completed').count()
-    completed_assigned = Project.query.filter(
-        Project.id.in_(assigned_project_ids),
-        Project.status == 'Completed'
-    ).count() if assigned_project_ids else 0
-    completed_projects = completed_owned + completed_assigned
+    """Get dashboard statistics in a single round trip"""
+    accessible = select(Project.status).where(accessible_by(current_user.id)).subquery()
     
     # My pending tasks (steps assigned to me that are In Progress)
-    my_pending_tasks = ProjectStep.query.filter_by(
-        assigned_user_id=current_user.id,
-        status='In Progress'
-    ).count()
-    
-    unread_notifications = Notification.query.filter_by(user_id=current_user.id, is_read=False).count()
+    pending_tasks = select(func.count()).select_from(ProjectStep).where(
+        ProjectStep.assigned_user_id == current_user.id,
+        ProjectStep.status == 'In Progress'
+    ).scalar_subquery()
+    
+    unread_notifications = select(func.count()).select_from(Notification).where(
+        Notification.user_id == current_user.id,
+        Notification.is_read == False
+    ).scalar_subquery()
+    
+    # Conditional aggregation over projects the user owns or is assigned to (each counted once)
+    stats = db.session.execute(
+        select(
+            func.count(),
+            func.count(case((accessible.c.status == 'In Progress', 1))),
+            func.count(case((accessible.c.status == 'Completed', 1))),
+            pending_tasks,
+            unread_notifications
+        ).select_from(accessible)
+    ).one()
     
     return jsonify({
-        'total_projects': total_projects,
-        'active_projects': active_projects,
-        'completed_projects': completed_projects,
-        'my_pending_tasks': my_pending_tasks,
-        'unread_notifications': unread_notifications
+        'total_projects': stats[0],
+        'active_projects': stats[1],
+        'completed_projects': stats[2],
+        'my_pending_tasks': stats[3],
+        'unread_notifications': stats[4]
     }), 200
 
 
@@ -1260,58 +1666,59 @@ def get_dashboard_stats(current_user):
 @token_required
 def upload_files(current_user, project_id):
     """Upload files for a project step"""
-    project = db.session.get(Project, project_id)
+    project, has_access = load_project_with_access(project_id, current_user.id)
     if not project:
-        return jsonify({'error': 'Project not found'}), 404
+        return error_response('Project not found', 404)
     
     # Check if user has access
-    is_owner = project.owner_id == current_user.id
-    is_assigned = ProjectStep.query.filter_by(
-        project_id=project_id,
-        assigned_user_id=current_user.id
-    ).first() is not None
-    
-    if not (is_owner or is_assigned):
-        return jsonify({'error': 'Access denied'}), 403
+    if not has_access:
+        return error_response('Access denied', 403)
     
     if 'files[]' not in request.files:
-        return jsonify({'error': 'No files uploaded'}), 400
+        return error_response('No files uploaded', 400)
     
     files = request.files.getlist('files[]')
     asset_type = request.form.get('asset_type', 'general')
-    metadata_assets = request.form.get('metadata_assets', '{}')
+    try:
+        metadata_assets = orjson.loads(request.form.get('metadata_assets') or '{}')
+    except ValueError:
+        return error_response('Invalid metadata_assets JSON', 400)
     
-    uploaded_assets = []
+    rows = []
+    # One timestamp per request - every file in the batch shares the same prefix
+    timestamp = datetime.now(timezone.utc).strftime('%Y%m%d_%H%M%S')
     
     for file in files:
         if file.filename == '':
             continue
         
         filename = secure_filename(file.filename)
-        timestamp = datetime.utcnow().strftime('%Y%m%d_%H%M%S')
         unique_filename = f"{project_id}_{timestamp}_{filename}"
         file_path = os.path.join(app.config['UPLOAD_FOLDER'], unique_filename)
-        file.save(file_path)
+        save_upload(file, file_path)
         
-        asset = ProjectAsset(
-            project_id=project.id,
-            uploaded_by=current_user.id,
-            asset_type=asset_type,
-            filename=filename,
-            file_path=unique_filename,  # Store only filename, not full path
-            metadata_assets=metadata_assets
-        )
-        db.session.add(asset)
-        uploaded_assets.append(asset)
-    
-    db.session.commit()
+        rows.append({
+            'project_id': project.id,
+            'uploaded_by': current_user.id,
+            'asset_type': asset_type,
+            'filename': filename,
+            'file_path': unique_filename,  # Store only filename, not full path
+            'metadata_assets': metadata_assets
+        })
+    
+    # One batched INSERT ... RETURNING for every file instead of a flush per asset
+    uploaded_assets = db.session.scalars(insert(ProjectAsset).returning(ProjectAsset), rows).all() if rows else []
     
     # Log action
     log_action(project.id, current_user.id, 'upload', comments=f'Uploaded {len(uploaded_assets)} file(s)')
     
+    # Serialize from the RETURNING values - after commit every asset would be reloaded one by one
+    assets = [asset.to_dict() for asset in uploaded_assets]
+    db.session.commit()
+    
     return jsonify({
         'message': f'{len(uploaded_assets)} file(s) uploaded successfully',
-        'assets': [asset.to_dict() for asset in uploaded_assets]
+        'assets': assets
     }), 200
 
 
@@ -1322,54 +1729,88 @@ def download_file(filename):
     token = request.args.get('token') or request.headers.get('Authorization')
     
     if not token:
-        return jsonify({'error': 'Token is missing'}), 401
+        return error_response('Token is missing', 401)
     
     try:
         if token.startswith('Bearer '):
             token = token[7:]
         
-        data = jwt.decode(token, app.config['SECRET_KEY'], algorithms=['HS256'])
-        current_user = db.session.get(User, data['user_id'])
+        # File requests come in bursts (thumbnails, previews) - serve auth from the caches
+        data = verify_token(token)
+        user_id = data['user_id']
         
-        if not current_user or not current_user.is_active:
-            return jsonify({'error': 'Invalid user'}), 401
+        if not get_current_user(user_id):
+            return error_response('Invalid user', 401)
         
-        # Verify user has access to this file
-        asset = ProjectAsset.query.filter_by(file_path=filename).first()
+        # Verify user has access to this file - asset, project and access check in one query
+        asset = db.session.execute(
+            select(ProjectAsset.id, accessible_by(user_id).label('has_access'))
+            .join(Project, ProjectAsset.project_id == Project.id)
+            .where(ProjectAsset.file_path == filename)
+        ).first()
         if not asset:
-            return jsonify({'error': 'File not found'}), 404
-        
-        project = Project.query.get(asset.project_id)
-        if not project:
-            return jsonify({'error': 'Project not found'}), 404
+            return error_response('File not found', 404)
         
-        # Check access
-        is_owner = project.owner_id == current_user.id
-        is_assigned = ProjectStep.query.filter_by(
-            project_id=project.id,
-            assigned_user_id=current_user.id
-        ).first() is not None
+        if not asset.has_access:
+            return error_response('Access denied', 403)
         
-        if not (is_owner or is_assigned):
-            return jsonify({'error': 'Access denied'}), 403
+        if app.config['UPLOAD_ACCEL_PREFIX']:
+            # nginx serves the bytes from its internal location - the worker is free immediately
+            response = make_response('')
+            response.headers['X-Accel-Redirect'] = app.config['UPLOAD_ACCEL_PREFIX'] + quote(filename)
+            response.headers['Content-Type'] = mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+            return response
         
+        # Honors USE_X_SENDFILE, otherwise streams through the worker
         return send_from_directory(app.config['UPLOAD_FOLDER'], filename)
         
     except jwt.ExpiredSignatureError:
-        return jsonify({'error': 'Token has expired'}), 401
+        return error_response('Token has expired', 401)
     except jwt.InvalidTokenError:
-        return jsonify({'error': 'Invalid token'}), 401
+        return error_response('Invalid token', 401)
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 
 # ==================== INITIALIZE DATABASE ====================
 
+def backfill_index(index):
+    """Create a missing index on an existing table - over duplicate rows a unique one is created non-unique"""
+    if inspect(db.engine).has_index(index.table.name, index.name):
+        return
+    
+    if index.unique:
+        columns = list(index.columns)
+        duplicate = db.session.execute(
+            select(*columns).group_by(*columns).having(func.count() > 1).limit(1)
+        ).first()
+        db.session.rollback()
+        if duplicate is not None:
+            # Rows written before the constraint existed - keep the lookups indexed and start up anyway
+            app.logger.warning(
+                'Duplicate %s rows in %s (e.g. %s) - creating %s without UNIQUE until they are cleaned up',
+                tuple(column.name for column in columns), index.table.name, tuple(duplicate), index.name
+            )
+            index.unique = False
+            try:
+                index.create(db.engine)
+            finally:
+                index.unique = True
+            return
+    
+    index.create(db.engine)
+
+
 def init_db():
     """Initialize database with sample data"""
     with app.app_context():
         db.create_all()
         
+        # create_all skips existing tables - add any indexes they are missing
+        for table in db.metadata.tables.values():
+            for index in table.indexes:
+                backfill_index(index)
+        
         # Check if users exist
         if User.query.count() == 0:
             # Create sample users - all standard users
@@ -1381,13 +1822,18 @@ def init_db():
                 {'username': 'emma', 'email': 'emma@example.com', 'password': 'password123', 'full_name': 'Emma Martinez'},
             ]
             
+            # Every sample account shares one password - run the deliberately slow hash once
+            sample_hashes = {}
             for user_data in users_data:
+                password = user_data['password']
+                if password not in sample_hashes:
+                    sample_hashes[password] = pwd_context.hash(password)
                 user = User(
                     username=user_data['username'],
                     email=user_data['email'],
-                    full_name=user_data['full_name']
+                    full_name=user_data['full_name'],
+                    password_hash=sample_hashes[password]
                 )
-                user.set_password(user_data['password'])
                 db.session.add(user)
             
             db.session.commit()
@@ -1397,7 +1843,14 @@ def init_db():
             print("  - alice, bob, charlie, diana, emma")
 
 
+@app.cli.command('init-db')
+def init_db_command():
+    """Create tables and sample users - run once before starting gunicorn workers"""
+    init_db()
+
+
 if __name__ == '__main__':
     init_db()
 
-    app.run(debug=True, host='0.0.0.0', port=5000)
+    # Development server only - production runs gunicorn_conf.py
+    app.run(debug=os.environ.get('FLASK_DEBUG') == '1', host='0.0.0.0', port=5000)
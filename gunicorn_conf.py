@@ -0,0 +1,15 @@
+"""
+Gunicorn settings for production
+Run with: gunicorn -c gunicorn_conf.py wsgi:app
+Create tables and sample users once beforehand with: flask --app app init-db
+"""
+
+import multiprocessing
+import os
+
+bind = os.environ.get('BIND', '0.0.0.0:5000')
+workers = int(os.environ.get('WEB_CONCURRENCY', multiprocessing.cpu_count() * 2 + 1))
+worker_class = 'gevent'  # Uploads and DB waits yield to other requests instead of holding a thread
+worker_connections = 1000
+timeout = 60
+keepalive = 5
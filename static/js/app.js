@@ -72,6 +72,21 @@ async function apiRequest(endpoint, options = {}) {
     return data;
 }
 
+async function apiRequestAll(endpoint) {
+    // Follow keyset cursors of a paginated listing until it is exhausted
+    const items = [];
+    const separator = endpoint.includes('?') ? '&' : '?';
+    let cursor = null;
+    
+    do {
+        const page = await apiRequest(cursor === null ? endpoint : `${endpoint}${separator}cursor=${cursor}`);
+        items.push(...page.items);
+        cursor = page.next;
+    } while (cursor !== null);
+    
+    return items;
+}
+
 function formatDate(dateString) {
     const date = new Date(dateString);
     return date.toLocaleDateString('en-US', { 
@@ -229,10 +244,9 @@ async function loadDashboardStats() {
         document.getElementById('pendingTasks').textContent = stats.my_pending_tasks;
         document.getElementById('notifBadge').textContent = stats.unread_notifications;
         
-        // Load recent projects for dashboard
-        const projects = await apiRequest('/projects');
-        allProjects = projects;
-        renderRecentProjects(projects.slice(0, 5));
+        // Load recent projects for dashboard - newest first, so one short page is enough
+        const page = await apiRequest('/projects?limit=5');
+        renderRecentProjects(page.items);
     } catch (error) {
         console.error('Failed to load stats:', error);
     }
@@ -277,7 +291,7 @@ function renderRecentProjects(projects) {
 // ==================== Projects Management ====================
 async function loadProjects() {
     try {
-        const projects = await apiRequest('/projects');
+        const projects = await apiRequestAll('/projects');
         allProjects = projects;
         renderProjects(projects);
     } catch (error) {
@@ -357,7 +371,7 @@ function setupStepBuilder() {
 
 async function loadUsersForAssignment() {
     try {
-        allUsers = await apiRequest('/users');
+        allUsers = await apiRequestAll('/users');
     } catch (error) {
         console.error('Failed to load users:', error);
     }
@@ -489,7 +503,7 @@ async function openProjectModal(projectId) {
     // Load project actions/history
     let actions = [];
     try {
-        actions = await apiRequest(`/projects/${projectId}/actions`);
+        actions = await apiRequestAll(`/projects/${projectId}/actions`);
     } catch (error) {
         console.error('Failed to load actions:', error);
     }
@@ -738,8 +752,8 @@ document.getElementById('projectModal').addEventListener('click', (e) => {
 // ==================== Notifications ====================
 async function loadNotifications() {
     try {
-        const notifications = await apiRequest('/notifications');
-        renderNotifications(notifications);
+        const page = await apiRequest('/notifications');
+        renderNotifications(page.items);
     } catch (error) {
         console.error('Failed to load notifications:', error);
     }
@@ -781,7 +795,7 @@ async function markNotificationRead(notifId) {
 
 document.getElementById('markAllRead').addEventListener('click', async () => {
     try {
-        const notifications = await apiRequest('/notifications');
+        const notifications = await apiRequestAll('/notifications');
         for (let notif of notifications.filter(n => !n.is_read)) {
             await apiRequest(`/notifications/${notif.id}/read`, { method: 'PUT' });
         }
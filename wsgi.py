@@ -0,0 +1,10 @@
+"""
+WSGI entry point for production
+Run with: gunicorn -c gunicorn_conf.py wsgi:app
+"""
+
+# Patch blocking stdlib I/O before anything else imports socket/threading
+from gevent import monkey
+monkey.patch_all()
+
+from app import app  # noqa: E402